@@ -3,8 +3,20 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Counter, Dict, List, NamedTuple, Optional, Set, Tuple
+from typing import (
+    Counter,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from terragraph_planner.common.configuration.enums import (
@@ -17,6 +29,22 @@ from terragraph_planner.common.topology_models.topology import Topology
 # (i, j, k) means a pair of link (i, j) and link (i, k) where i, j, k are site ids
 LinkPair = Tuple[str, str, str]
 
+# Sites disconnected by the failure of each edge, each POP site and each DN site
+FailureDisruptions = Tuple[
+    Dict[Tuple[str, str], Set[str]], Dict[str, Set[str]], Dict[str, Set[str]]
+]
+
+# Value of a reported cell, None if the value is missing
+ReportValue = Optional[Union[str, float, int, bool]]
+
+# Values of a reported column, in an array if the column has a declared dtype
+ReportColumn = Union[List[ReportValue], npt.NDArray[np.generic]]
+
+# Value of the metrics converted for a json dump
+JsonValue = Union[
+    None, bool, int, float, str, List["JsonValue"], Dict[str, "JsonValue"]
+]
+
 
 class MetricStatistics(NamedTuple):
     avg: float
@@ -34,6 +62,16 @@ class AngleViolatingLinkPairs(NamedTuple):
     near_far_list: List[LinkPair]
 
 
+class ActiveLinkStatistics(NamedTuple):
+    backhaul_links_per_sector: Dict[str, Set[str]]
+    access_links_per_sector: Dict[str, Set[str]]
+    wireless_links_per_site: Dict[str, Set[str]]
+    backhaul_link_dist: List[float]
+    access_link_dist: List[float]
+    backhaul_link_mcs: Dict[Tuple[str, str], int]
+    access_link_mcs: Dict[Tuple[str, str], int]
+
+
 class Capex(NamedTuple):
     total_capex: float
     proposed_capex: float
@@ -187,3 +225,11 @@ class AnalysisResult(NamedTuple):
     site_df: pd.DataFrame
     sector_df: pd.DataFrame
     metrics: TopologyMetrics
+
+
+class ReportColumns(NamedTuple):
+    topology: Topology
+    link_columns: Optional[Mapping[str, ReportColumn]]
+    site_columns: Optional[Mapping[str, ReportColumn]]
+    sector_columns: Optional[Mapping[str, ReportColumn]]
+    metrics: TopologyMetrics
@@ -21,9 +21,13 @@ from terragraph_planner.common.configuration.enums import (
     DeviceType,
     SectorType,
     SiteType,
+    StatusType,
 )
 from terragraph_planner.common.constants import FULL_ROTATION_ANGLE
-from terragraph_planner.common.exceptions import OptimizerException
+from terragraph_planner.common.exceptions import (
+    OptimizerException,
+    TopologyException,
+)
 from terragraph_planner.common.geos import GeoLocation, angle_delta
 from terragraph_planner.common.topology_models.link import Link
 from terragraph_planner.common.topology_models.sector import Sector
@@ -47,6 +51,7 @@ from terragraph_planner.optimization.topology_preparation import (
     prepare_topology_for_optimization,
     validate_link_sectors,
     validate_site_sectors,
+    validate_topology_status,
 )
 
 TEST_PREFIX = "terragraph_planner.optimization.topology_preparation"
@@ -670,6 +675,82 @@ class TestValidateSectors(TestCase):
         # No error should be throw in this case
         validate_link_sectors(link, force_full_cn_scan_range=True)
 
+    def test_validate_topology_status(self) -> None:
+        site1 = SampleSite(
+            site_type=SiteType.DN,
+            status_type=StatusType.PROPOSED,
+            location=GeoLocation(utm_x=0, utm_y=0, utm_epsg=32631, altitude=0),
+        )
+        site2 = SampleSite(
+            site_type=SiteType.DN,
+            status_type=StatusType.PROPOSED,
+            location=GeoLocation(utm_x=0, utm_y=1, utm_epsg=32631, altitude=0),
+        )
+        sector1 = Sector(
+            site=site1,
+            node_id=0,
+            position_in_node=0,
+            ant_azimuth=0,
+            status_type=StatusType.PROPOSED,
+        )
+        sector2 = Sector(
+            site=site2,
+            node_id=0,
+            position_in_node=0,
+            ant_azimuth=180,
+            status_type=StatusType.PROPOSED,
+        )
+        # The reverse link leaves site2 from a different sector
+        sector3 = Sector(
+            site=site2,
+            node_id=1,
+            position_in_node=0,
+            ant_azimuth=180,
+            status_type=StatusType.PROPOSED,
+        )
+        link = Link(
+            tx_sector=sector1,
+            rx_sector=sector2,
+            status_type=StatusType.PROPOSED,
+        )
+        reverse_link = Link(
+            tx_sector=sector3,
+            rx_sector=sector1,
+            status_type=StatusType.PROPOSED,
+        )
+        topology = Topology(
+            sites=[site1, site2],
+            sectors=[sector1, sector2, sector3],
+            links=[link, reverse_link],
+        )
+
+        # No error should be thrown in this case
+        validate_topology_status(topology)
+
+        # Sectors of both directions are validated
+        sector3.status_type = StatusType.CANDIDATE
+        with self.assertRaisesRegex(
+            TopologyException,
+            f"Active link {reverse_link.link_id} must be connected to active sectors.",
+        ):
+            validate_topology_status(topology)
+
+        sector3.status_type = StatusType.PROPOSED
+        reverse_link.status_type = StatusType.CANDIDATE
+        with self.assertRaisesRegex(
+            TopologyException,
+            f"A link {link.link_id} and its symmetric link have conflicting status types.",
+        ):
+            validate_topology_status(topology)
+
+        link.status_type = StatusType.CANDIDATE
+        site2.status_type = StatusType.UNREACHABLE
+        with self.assertRaisesRegex(
+            TopologyException,
+            f"Candidate link {link.link_id} cannot be connected to inactive sites.",
+        ):
+            validate_topology_status(topology)
+
 
 class TestFindBestEquidistantSectors(TestCase):
     def test_find_equidistant_straight_line_sectors(self) -> None:
@@ -1688,6 +1769,41 @@ class TestFindBestSectors(TestCase):
         self.assertEqual(len(sectors), 1)
         self.assertEqual(sectors[0], 27)
 
+    @patch(
+        f"{TEST_PREFIX}.bearing_in_degrees",
+        MagicMock(return_value=[0, 30]),
+    )
+    def test_fractional_link_type_weighted_sectors(self) -> None:
+        """
+        Test that a fractional link type weight is not truncated when the
+        first neighbor is not a distribution site
+        """
+        neighbor_site_list = [
+            SampleSite(
+                site_type=site_type,
+                location=GeoLocation(utm_x=0, utm_y=0, utm_epsg=32631),
+            )
+            for site_type in (SiteType.CN, SiteType.DN)
+        ]
+        sectors = find_best_sectors(
+            site=self.from_site,
+            neighbor_site_list=neighbor_site_list,
+            number_of_nodes=1,
+            number_of_sectors_per_node=self.number_of_sectors_per_node,
+            horizontal_scan_range=self.horizontal_scan_range,
+            dn_dn_sector_limit=self.dn_dn_sector_limit,
+            dn_total_sector_limit=self.dn_total_sector_limit,
+            diff_sector_angle_limit=None,
+            near_far_angle_limit=None,
+            near_far_length_ratio=None,
+            backhaul_link_type_weight=1.5,
+            sector_channel_list=None,
+        )
+        # Sector boresight between the middle of the links (15) and the DN
+        # link (30), closer to the middle
+        self.assertEqual(len(sectors), 1)
+        self.assertEqual(sectors[0], 18)
+
     @patch(f"{TEST_PREFIX}.bearing_in_degrees")
     @patch(f"{TEST_PREFIX}.law_of_cosines_spherical")
     def test_angle_deployment_rules(
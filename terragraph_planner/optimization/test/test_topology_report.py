@@ -3,7 +3,13 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import gc
+import json
+import os
+import tempfile
+import weakref
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from pyre_extensions import none_throws
 
@@ -17,14 +23,41 @@ from terragraph_planner.common.data_io.data_key import (
     SectorKey,
     SiteKey,
 )
+from terragraph_planner.common.exceptions import (
+    OptimizerException,
+    TopologyException,
+)
 from terragraph_planner.common.topology_models.test.helper import (
     DEFAULT_CN_DEVICE,
     DEFAULT_DN_DEVICE,
+    dpa_topology,
     square_topology,
     square_topology_with_cns,
 )
-from terragraph_planner.optimization.structs import Capex, TopologyCounts
-from terragraph_planner.optimization.topology_report import analyze
+from terragraph_planner.common.utils import current_system_params
+from terragraph_planner.optimization.structs import (
+    Capex,
+    MetricStatistics,
+    TopologyCounts,
+)
+from terragraph_planner.optimization.topology_networkx import (
+    build_digraph,
+    single_edge_failures,
+    single_site_failures,
+)
+from terragraph_planner.optimization.topology_operations import hops_from_pops
+from terragraph_planner.optimization.topology_report import (
+    _cached_failure_disruptions,
+    _cached_hops_from_pops,
+    analyze,
+    analyze_with_dump,
+    clear_graph_result_caches,
+    convert_metrics_to_dict,
+    get_graph_signature,
+    get_hop_signature,
+    get_metric_statistics,
+    get_routing_flow_solution,
+)
 
 
 class TestTopologyReport(TestCase):
@@ -314,3 +347,214 @@ class TestTopologyReport(TestCase):
         self.assertAlmostEqual(
             flow_metrics.link_capacity_utilization.min, 0.0, 6
         )
+
+    def test_topology_without_active_sites(self) -> None:
+        params = OptimizerParams(
+            device_list=[DEFAULT_DN_DEVICE, DEFAULT_CN_DEVICE]
+        )
+        topology = square_topology()
+
+        result = analyze(topology, params)
+
+        self.assertTrue(result.link_df.empty)
+        self.assertTrue(result.site_df.empty)
+        self.assertTrue(result.sector_df.empty)
+        self.assertIsNone(result.metrics.flow_metrics)
+        self.assertEqual(result.metrics.counts.active_sites, 0)
+        self.assertEqual(result.metrics.counts.total_sites, 6)
+        self.assertEqual(
+            result.metrics.demand_metrics.number_of_disconnected_demands,
+            len(topology.demand_sites),
+        )
+
+    def test_invalid_topology_without_active_sites(self) -> None:
+        params = OptimizerParams(
+            device_list=[DEFAULT_DN_DEVICE, DEFAULT_CN_DEVICE]
+        )
+        # dpa_topology has no active site and a unidirectional backhaul link
+        topology = dpa_topology()
+
+        with self.assertRaisesRegex(
+            TopologyException, "Backhaul link POP1-DN3 must be bidirectional"
+        ):
+            analyze(topology, params)
+
+    def test_dump_metrics_to_json(self) -> None:
+        params = OptimizerParams(
+            device_list=[DEFAULT_DN_DEVICE, DEFAULT_CN_DEVICE]
+        )
+        topology = square_topology_with_cns()
+        for component in [
+            *topology.sites.values(),
+            *topology.sectors.values(),
+            *topology.links.values(),
+        ]:
+            component.status_type = StatusType.PROPOSED
+        with tempfile.TemporaryDirectory() as output_dir, patch.object(
+            current_system_params, "output_dir", output_dir
+        ):
+            # The metrics are only dumped to yaml by default
+            analyze_with_dump(topology, params)
+            dump_dir = os.path.join(output_dir, "output")
+            self.assertTrue(
+                os.path.isfile(os.path.join(dump_dir, "metrics.yaml"))
+            )
+            self.assertFalse(
+                os.path.isfile(os.path.join(dump_dir, "metrics.json"))
+            )
+
+        with tempfile.TemporaryDirectory() as output_dir, patch.object(
+            current_system_params, "output_dir", output_dir
+        ):
+            result = analyze_with_dump(topology, params, metrics_format="json")
+            dump_dir = os.path.join(output_dir, "output")
+            self.assertFalse(
+                os.path.isfile(os.path.join(dump_dir, "metrics.yaml"))
+            )
+            with open(os.path.join(dump_dir, "metrics.json")) as f:
+                metrics = json.load(f)
+
+        # json object keys are strings, e.g. the MCS keys
+        expected_metrics = convert_metrics_to_dict(result.metrics)
+        self.assertEqual(metrics, expected_metrics)
+        self.assertEqual(
+            metrics["backhaul_mcs"],
+            {
+                str(mcs): count
+                for mcs, count in result.metrics.backhaul_mcs.items()
+            },
+        )
+        self.assertEqual(
+            metrics["counts"]["active_sites"],
+            result.metrics.counts.active_sites,
+        )
+
+        with self.assertRaisesRegex(
+            OptimizerException, "Metrics format must be one of yaml, json"
+        ):
+            analyze_with_dump(topology, params, metrics_format="xml")
+
+    @patch(
+        "terragraph_planner.optimization.topology_report."
+        "update_link_caps_with_sinr"
+    )
+    def test_zero_capacity_link_utilization(self, _: MagicMock) -> None:
+        params = OptimizerParams(
+            device_list=[DEFAULT_DN_DEVICE, DEFAULT_CN_DEVICE]
+        )
+        topology = square_topology()
+        for component in [
+            *topology.sites.values(),
+            *topology.sectors.values(),
+            *topology.links.values(),
+        ]:
+            component.status_type = StatusType.PROPOSED
+        topology.links["DN1-DN2"].capacity = 0
+        topology.links["DN2-DN1"].capacity = 0
+
+        routing_solution = none_throws(
+            get_routing_flow_solution(topology, params)
+        )
+
+        # Links without capacity keep an integer zero utilization
+        utilization = routing_solution.active_link_utilization[("DN1", "DN2")]
+        self.assertEqual(utilization, 0)
+        self.assertIsInstance(utilization, int)
+        self.assertIsInstance(
+            routing_solution.active_link_utilization[("POP5", "DN1")], float
+        )
+
+    def test_get_graph_signature(self) -> None:
+        status_filter = set(StatusType)
+        graph = build_digraph(square_topology(), status_filter)
+        same_graph = build_digraph(square_topology(), status_filter)
+        self.assertEqual(
+            get_graph_signature(graph), get_graph_signature(same_graph)
+        )
+
+        same_graph.remove_edge(*next(iter(same_graph.edges)))
+        self.assertNotEqual(
+            get_graph_signature(graph), get_graph_signature(same_graph)
+        )
+
+    def test_get_hop_signature(self) -> None:
+        topology = square_topology()
+        for component in [*topology.sites.values(), *topology.links.values()]:
+            component.status_type = StatusType.PROPOSED
+        signature = get_hop_signature(topology)
+
+        # Changes of fields hops_from_pops does not read keep the signature
+        topology.sites["DN1"].name = "DN1 renamed"
+        self.assertEqual(get_hop_signature(topology), signature)
+
+        topology.links["DN1-DN2"].status_type = StatusType.CANDIDATE
+        self.assertNotEqual(get_hop_signature(topology), signature)
+        topology.links["DN1-DN2"].status_type = StatusType.PROPOSED
+        self.assertEqual(get_hop_signature(topology), signature)
+
+        topology.sites["POP5"].status_type = StatusType.CANDIDATE
+        self.assertNotEqual(get_hop_signature(topology), signature)
+
+    def test_cached_hops_from_pops(self) -> None:
+        clear_graph_result_caches()
+        topology = square_topology()
+        for component in [*topology.sites.values(), *topology.links.values()]:
+            component.status_type = StatusType.PROPOSED
+        active_status = StatusType.active_status()
+        hop_counts = _cached_hops_from_pops(topology)
+        self.assertEqual(hop_counts, hops_from_pops(topology, active_status))
+        self.assertEqual(hop_counts["DN1"], 1)
+
+        # Mutating the returned hop counts does not change the cached ones
+        hop_counts["DN1"] = 10
+        self.assertEqual(_cached_hops_from_pops(topology)["DN1"], 1)
+
+        # A changed topology does not hit the result of the original one
+        topology.sites["POP5"].status_type = StatusType.CANDIDATE
+        hop_counts = _cached_hops_from_pops(topology)
+        self.assertEqual(hop_counts, hops_from_pops(topology, active_status))
+        self.assertEqual(hop_counts["DN1"], 2)
+
+    def test_cached_failure_disruptions(self) -> None:
+        clear_graph_result_caches()
+        graph = build_digraph(square_topology(), set(StatusType))
+        expected = (single_edge_failures(graph), *single_site_failures(graph))
+        failure_disruptions = _cached_failure_disruptions(graph)
+        self.assertEqual(failure_disruptions, expected)
+
+        # Mutating the returned disruptions does not change the cached ones
+        failure_disruptions[2]["DN1"].clear()
+        self.assertEqual(_cached_failure_disruptions(graph), expected)
+
+        # A changed graph does not hit the result of the original one
+        graph.remove_node("POP5")
+        expected = (single_edge_failures(graph), *single_site_failures(graph))
+        self.assertEqual(_cached_failure_disruptions(graph), expected)
+
+        # The cache does not keep the graph alive
+        graph_ref = weakref.ref(graph)
+        del graph
+        gc.collect()
+        self.assertIsNone(graph_ref())
+
+    def test_get_metric_statistics(self) -> None:
+        self.assertEqual(
+            get_metric_statistics([]),
+            MetricStatistics(avg=0.0, max=0.0, min=0.0),
+        )
+        # Statistics without values are dumped as floats, like the average
+        self.assertIsInstance(get_metric_statistics([]).max, float)
+        self.assertIsInstance(get_metric_statistics([3, 1, 2], 4).min, float)
+        self.assertEqual(
+            get_metric_statistics([3, 1, 2]),
+            MetricStatistics(avg=2.0, max=3, min=1),
+        )
+        # Components without a value count as 0 in the average and minimum
+        self.assertEqual(
+            get_metric_statistics([3, 1, 2], 4),
+            MetricStatistics(avg=1.5, max=3, min=0.0),
+        )
+        # The average keeps the summation order of the Python sum
+        self.assertEqual(
+            get_metric_statistics(10 * [0.1]).avg, sum(10 * [0.1]) / 10
+        )
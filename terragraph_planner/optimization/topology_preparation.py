@@ -5,7 +5,7 @@
 
 import math
 from itertools import combinations, product
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
@@ -581,48 +581,30 @@ def find_best_equidistant_sectors(
 
 
 def get_sector_azimuths_from_node_center(
-    center_bearing: float, number_of_sectors: int, horizontal_scan_range: float
+    center_bearing: Union[float, npt.NDArray[np.float64]],
+    number_of_sectors: int,
+    horizontal_scan_range: float,
 ) -> npt.NDArray[np.float64]:
     """
     Helper function to get the sector azimuth positions for a node at position
     center_bearing. Returns a numpy array of equally spaced azimuths centered
-    at the center_bearing input.
+    at the center_bearing input. If center_bearing is an array of bearings,
+    the sector azimuths of each node are along an extra last axis.
 
     @param center_bearing: the bearing, in degrees, of the middle of the node
     @param number_of_sectors: the number of sectors in the node
     @param horizontal_scan_range: width, in degrees, of a sector's range
     """
-    if number_of_sectors == 0:
-        return np.array([])
-    if number_of_sectors % 2 == 0:
-        # even number: sectors are half a scan range off center
-        start_sector_angle = center_bearing - horizontal_scan_range * (
-            number_of_sectors / 2 - 0.5
-        )
-        end_sector_angle = center_bearing + horizontal_scan_range * (
-            number_of_sectors / 2 - 0.5
-        )
-    else:
-        # odd number: center sector is exactly at center_bearing
-        start_sector_angle = (
-            center_bearing
-            - horizontal_scan_range * math.floor(number_of_sectors / 2)
-        )
-        end_sector_angle = center_bearing + horizontal_scan_range * math.floor(
-            number_of_sectors / 2
-        )
-
-    # overshoot by horizontal_beamwdith / 2 so we always finish at end_sector_angle
+    # With an even number, sectors are half a scan range off center; with an
+    # odd number, the center sector is exactly at center_bearing
+    sector_offsets = (
+        np.arange(number_of_sectors) - (number_of_sectors - 1) / 2
+    ) * horizontal_scan_range
     sector_positions = (
-        np.arange(
-            start_sector_angle,
-            end_sector_angle + horizontal_scan_range / 2,
-            horizontal_scan_range,
-        )
-        % FULL_ROTATION_ANGLE
-    )
+        np.expand_dims(center_bearing, -1) + sector_offsets
+    ) % FULL_ROTATION_ANGLE
     planner_assert(
-        len(sector_positions) == number_of_sectors,
+        sector_positions.shape[-1] == number_of_sectors,
         "Number of sector positions does not match number of sectors",
         OptimizerException,
     )
@@ -653,13 +635,16 @@ def find_best_sectors(
             by DEFAULT_POINTING_PRECISION), filter out those violating the
             constraints and compute the sum of squared angular for each candidate
             position if it's chosen
-    Step 3: Use dynamic programming to find the best position. First choose a
-            candidate as the first sector position, and for each first sector
-            position, mets[i][j] equal to the minimal sum of squared angular
-            difference when we have i sectors assigned and the last sector
-            position is at the angle azimuth_candidate[j]
-            mets[i][j] = min(mets[i-1][k] + node_mets[j]) for all k if
-            azimuth_candidate[k] is not inferenced by zimuth_candidate[j]
+    Step 3: Use dynamic programming to find the best position. For each
+            candidate i of the first node position, tried from the lowest
+            node_mets[i] up until it alone exceeds the best met found, mets[j]
+            is the minimal met of the nodes assigned so far with the last one
+            at azimuth_candidates[j]. A node at j can follow the nodes ending
+            at any k < prev_candidate_limit[j] (found with np.searchsorted),
+            so one layer is computed for all j at once from the prefix minima
+            of mets: mets'[j] = min(mets[:prev_candidate_limit[j]]) +
+            node_mets[j]. The last layer is kept in final_mets[i] and the
+            chosen k in prev_sectors[i] to backtrack the best position
 
     @param site: the subject site to find best sector angles
     @param neighbor_site_list: list of neighbor sites that connected with the subject site
@@ -736,14 +721,21 @@ def find_best_sectors(
     same_sector_violation_pairs = []
     if sector_channel_list is not None:
         # multi-channels plan with more than 1 channel assigned to the site
-        for j1, j2 in combinations(range(num_neighbors), 2):
-            # links were from the same sector cannot be assigned to diff sector
-            # here already considered angle rules since they were applied in optimizer
-            if sector_channel_list[j1][0] == sector_channel_list[j2][0]:
-                diff_sector_violation_pairs.append((j1, j2))
-            # links were with diff channels cannot be assigned to the same sector
-            if sector_channel_list[j1][1] != sector_channel_list[j2][1]:
-                same_sector_violation_pairs.append((j1, j2))
+        tx_sector_ids = np.array([sector for sector, _ in sector_channel_list])
+        channels = np.array([channel for _, channel in sector_channel_list])
+        # all (j1, j2) pairs with j1 < j2, in the same order as combinations
+        pair_j1, pair_j2 = np.triu_indices(num_neighbors, k=1)
+        # links were from the same sector cannot be assigned to diff sector
+        # here already considered angle rules since they were applied in optimizer
+        same_sector = tx_sector_ids[pair_j1] == tx_sector_ids[pair_j2]
+        diff_sector_violation_pairs = list(
+            zip(pair_j1[same_sector].tolist(), pair_j2[same_sector].tolist())
+        )
+        # links were with diff channels cannot be assigned to the same sector
+        diff_channel = channels[pair_j1] != channels[pair_j2]
+        same_sector_violation_pairs = list(
+            zip(pair_j1[diff_channel].tolist(), pair_j2[diff_channel].tolist())
+        )
     else:
         # angle violation check only needed when there is unique channel
         diff_sector_violation_pairs = angle_violation_pairs
@@ -763,14 +755,12 @@ def find_best_sectors(
         np.arange(num_azimuth_candidates).reshape(-1, 1)
         * DEFAULT_POINTING_PRECISION
     )
-    sector_azimuth_candidates = np.array(
-        [
-            get_sector_azimuths_from_node_center(
-                cb, number_of_sectors_per_node, horizontal_scan_range
-            ).reshape(-1, 1)
-            for cb in node_azimuth_candidates
-        ]
-    )
+    # sector azimuths of all node candidates at once, with shape (K, S, 1)
+    sector_azimuth_candidates = get_sector_azimuths_from_node_center(
+        node_azimuth_candidates.reshape(-1),
+        number_of_sectors_per_node,
+        horizontal_scan_range,
+    )[:, :, np.newaxis]
     # Angle delta between node and link
     node_delta = abs(node_azimuth_candidates - link_angles)
     # Angle delta between sector and link
@@ -868,15 +858,24 @@ def find_best_sectors(
                     node_azimuth_link_mat[k2][j1] = 0
                     node_azimuth_link_mat[k1][j2] = 0
 
-    dist_type_sites = np.vectorize(
-        lambda site: 1 if site.site_type in SiteType.dist_site_types() else 0
-    )(neighbor_site_list)
+    dist_site_types = frozenset(SiteType.dist_site_types())
+    dist_type_sites = np.fromiter(
+        (
+            1 if site.site_type in dist_site_types else 0
+            for site in neighbor_site_list
+        ),
+        dtype=np.uint8,
+        count=num_neighbors,
+    )
     link_type_weight = backhaul_link_type_weight or 1
-    dist_type_weight = np.vectorize(
-        lambda site: link_type_weight
-        if site.site_type in SiteType.dist_site_types()
-        else 1
-    )(neighbor_site_list)
+    dist_type_weight = np.fromiter(
+        (
+            link_type_weight if site.site_type in dist_site_types else 1
+            for site in neighbor_site_list
+        ),
+        dtype=np.float64,
+        count=num_neighbors,
+    )
 
     # get indexes of sectors that have a reasonable number of links assigned
     # note that pre-optimization, this is a no-op. If sector limits aren't
@@ -885,16 +884,15 @@ def find_best_sectors(
         dn_dn_sector_limit = num_neighbors
     if dn_total_sector_limit is None:
         dn_total_sector_limit = num_neighbors
-    valid_candidate_idx = np.logical_and(
-        np.all(
-            sector_azimuth_link_mat.sum(axis=2) <= dn_total_sector_limit, axis=1
-        ),
-        np.all(
-            (sector_azimuth_link_mat * dist_type_sites).sum(axis=2)
-            <= dn_dn_sector_limit,
-            axis=1,
-        ),
+    sector_link_counts = sector_azimuth_link_mat.sum(axis=2)
+    # dist_type_sites is 0/1, so this counts the DN links of each sector
+    # without materializing the (K, S, P) product
+    sector_dn_link_counts = np.einsum(
+        "ksp,p->ks", sector_azimuth_link_mat, dist_type_sites
     )
+    valid_candidate_idx = np.all(
+        sector_link_counts <= dn_total_sector_limit, axis=1
+    ) & np.all(sector_dn_link_counts <= dn_dn_sector_limit, axis=1)
     # this should never happen in pre-optimization
     if not any(valid_candidate_idx):
         return []
@@ -905,91 +903,129 @@ def find_best_sectors(
     ]
     node_azimuth_link_mat = node_azimuth_link_mat[valid_candidate_idx]
     sector_azimuth_link_mat = sector_azimuth_link_mat[valid_candidate_idx]
-    sector_weighted = (
-        sector_delta**2
-        * link_dists
-        / max(link_dists)  # pyre-fixme
-        * dist_type_weight
+    max_link_dist = np.max(link_dists)
+    sector_weighted = np.where(
+        sector_azimuth_link_mat == 1,
+        sector_delta**2 * link_dists / max_link_dist * dist_type_weight,
+        UNCOVERED_PENALTY,
     )
-    sector_weighted[sector_azimuth_link_mat == 0] = UNCOVERED_PENALTY
     node_mets = sector_weighted.sum(axis=(1, 2))
     num_azimuth_candidates = azimuth_candidates.shape[0]
 
     # Step 3: Dynamic programming to get best sector positions
     # Upper bound is all angles being missed by all nodes. There should be at
     # least one configuration better than this.
-    best_met = (
+    met_upper_bound = (
         num_nodes * number_of_sectors_per_node * num_neighbors + 1
     ) * UNCOVERED_PENALTY**2
-    best_position = None
-    for first_node_idx in range(num_azimuth_candidates):
-        if (
-            azimuth_candidates[first_node_idx]
-            >= FULL_ROTATION_ANGLE
+    # azimuth_candidates is sorted, so the first nodes leaving enough room for
+    # the remaining nodes form a prefix of it
+    first_idx_limit = int(
+        np.searchsorted(
+            azimuth_candidates,
+            FULL_ROTATION_ANGLE
             - (num_nodes - 1)
             * horizontal_scan_range
-            * number_of_sectors_per_node
-        ):
+            * number_of_sectors_per_node,
+            side="left",
+        )
+    )
+    node_width = horizontal_scan_range * number_of_sectors_per_node
+    # Candidate j can follow candidate k iff their azimuths are at least
+    # node_width apart. azimuth_candidates is sorted, so the valid k for each
+    # j form a prefix of length prev_candidate_limit[j]; the bisection result
+    # is nudged so it agrees exactly with the floating point comparison
+    prev_candidate_limit = np.searchsorted(
+        azimuth_candidates, azimuth_candidates - node_width, side="right"
+    )
+    while True:
+        too_long = (prev_candidate_limit > 0) & (
+            azimuth_candidates
+            - azimuth_candidates[np.maximum(prev_candidate_limit - 1, 0)]
+            < node_width
+        )
+        too_short = (prev_candidate_limit < num_azimuth_candidates) & (
+            azimuth_candidates
+            - azimuth_candidates[
+                np.minimum(prev_candidate_limit, num_azimuth_candidates - 1)
+            ]
+            >= node_width
+        )
+        if not too_long.any() and not too_short.any():
+            break
+        prev_candidate_limit -= too_long
+        prev_candidate_limit += too_short
+    has_prev_candidate = prev_candidate_limit > 0
+    prev_candidate_last = np.maximum(prev_candidate_limit - 1, 0)
+    candidate_range = np.arange(num_azimuth_candidates)
+
+    # final_mets[i][j] is the minimal met when the first node is at
+    # azimuth_candidates[i] and the last one at azimuth_candidates[j], with
+    # prev_sectors[i] recording the positions of that solution
+    final_mets = np.full((first_idx_limit, num_azimuth_candidates), math.inf)
+    prev_sectors = np.full(
+        (first_idx_limit, num_nodes, num_azimuth_candidates), -1
+    )
+    # The met of a solution is at least the met of its first node, so try the
+    # cheapest first nodes first and stop once the first node alone is worse
+    # than the best solution found so far
+    best_met = met_upper_bound
+    for first_node_idx in np.argsort(
+        node_mets[:first_idx_limit], kind="stable"
+    ):
+        if node_mets[first_node_idx] > best_met:
             break
-        mets = [[math.inf] * num_azimuth_candidates for _ in range(num_nodes)]
-        # prev_sector used to record the position for the best solution
-        prev_sector = [[-1] * num_azimuth_candidates for _ in range(num_nodes)]
-        mets[0][first_node_idx] = node_mets[first_node_idx]
+        # Only the latest layer of mets is needed to compute the next one
+        mets = np.full(num_azimuth_candidates, math.inf)
+        mets[first_node_idx] = node_mets[first_node_idx]
+        prev_sector = prev_sectors[first_node_idx]
+        # Candidates that do not interfere with the first sector
+        next_candidate_valid = has_prev_candidate & (
+            azimuth_candidates[first_node_idx]
+            + FULL_ROTATION_ANGLE
+            - azimuth_candidates
+            >= node_width
+        )
         for num_assigned_nodes in range(0, num_nodes - 1):
-            for candidate_idx in range(num_azimuth_candidates):
-                if mets[num_assigned_nodes][candidate_idx] < math.inf:
-                    for next_candidate_idx in range(
-                        candidate_idx + 1, num_azimuth_candidates
-                    ):
-                        # Interfere with the last sector
-                        if (
-                            azimuth_candidates[next_candidate_idx]
-                            - azimuth_candidates[candidate_idx]
-                            < horizontal_scan_range * number_of_sectors_per_node
-                        ):
-                            continue
-                        # Interfere with the first sector
-                        if (
-                            azimuth_candidates[first_node_idx]
-                            + FULL_ROTATION_ANGLE
-                            - azimuth_candidates[next_candidate_idx]
-                            < horizontal_scan_range * number_of_sectors_per_node
-                        ):
-                            break
-                        if (
-                            mets[num_assigned_nodes][candidate_idx]
-                            + node_mets[next_candidate_idx]
-                            < mets[num_assigned_nodes + 1][next_candidate_idx]
-                        ):
-                            mets[num_assigned_nodes + 1][next_candidate_idx] = (
-                                mets[num_assigned_nodes][candidate_idx]
-                                + node_mets[next_candidate_idx]
-                            )
-                            prev_sector[num_assigned_nodes + 1][
-                                next_candidate_idx
-                            ] = candidate_idx
-        best_met_this_round = min(mets[-1])
-        if best_met_this_round < best_met:
-            best_met = best_met_this_round
-            best_idx = mets[-1].index(best_met)
-            best_position = [best_idx]
-            for node_idx in range(num_nodes - 1, 0, -1):
-                best_idx = prev_sector[node_idx][best_idx]
-                best_position.append(best_idx)
+            # For every prefix of candidates, the minimal met and the first
+            # candidate attaining it
+            prefix_min_met = np.minimum.accumulate(mets)
+            is_new_min = np.ones(num_azimuth_candidates, dtype=bool)
+            is_new_min[1:] = mets[1:] < prefix_min_met[:-1]
+            prefix_argmin = np.maximum.accumulate(
+                np.where(is_new_min, candidate_range, 0)
+            )
+            next_mets = prefix_min_met[prev_candidate_last] + node_mets
+            improved = next_candidate_valid & (next_mets < math.inf)
+            mets = np.where(improved, next_mets, math.inf)
+            prev_sector[num_assigned_nodes + 1][improved] = prefix_argmin[
+                prev_candidate_last
+            ][improved]
+        final_mets[first_node_idx] = mets
+        best_met = min(best_met, mets.min())
 
     # Something is very wrong if we couldn't improve on the original `mets`
     planner_assert(
-        best_position is not None,
+        final_mets.size > 0 and final_mets.min() < met_upper_bound,
         "Could not find best sector position",
         OptimizerException,
     )
+    # argmin returns the first minimum in row-major order, so ties resolve to
+    # the lowest first node and then the lowest last node
+    best_first_node_idx, best_idx = np.unravel_index(
+        final_mets.argmin(), final_mets.shape
+    )
+    best_position = [int(best_idx)]
+    for node_idx in range(num_nodes - 1, 0, -1):
+        best_idx = prev_sectors[best_first_node_idx][node_idx][best_idx]
+        best_position.append(int(best_idx))
     return [
         get_sector_azimuths_from_node_center(
             azimuth_candidates[sector_idx],
             number_of_sectors_per_node,
             horizontal_scan_range,
         )
-        for sector_idx in reversed(none_throws(best_position))
+        for sector_idx in reversed(best_position)
         if sum(node_azimuth_link_mat[sector_idx])
         > 0  # drop nodes that cover nothing
     ]
@@ -1001,10 +1037,20 @@ def validate_topology_status(topology: Topology) -> None:
     the links, sites and sectors before optimization as well as before reporting.
     An error will be thrown if inconsistent status type found.
     """
+    active_status = frozenset(StatusType.active_status())
+    inactive_status = frozenset(StatusType.inactive_status())
+    # Symmetric links share their sites and status type, so each pair is
+    # validated once, when the first of the two links is visited
+    validated_link_ids = set()
     for link in topology.links.values():
+        if link.link_id in validated_link_ids:
+            continue
+        tx_site = link.tx_site
+        rx_site = link.rx_site
+        status_type = link.status_type
         # Symmetric links, i.e. links (i, j) and (j, i), must have the same status type.
         reverse_link = topology.get_link_by_site_ids(
-            link.rx_site.site_id, link.tx_site.site_id
+            rx_site.site_id, tx_site.site_id
         )
         if link.link_type != LinkType.WIRELESS_ACCESS:
             planner_assert(
@@ -1014,68 +1060,72 @@ def validate_topology_status(topology: Topology) -> None:
             )
         if reverse_link is None:
             continue
+        validated_link_ids.add(reverse_link.link_id)
         planner_assert(
-            link.status_type == reverse_link.status_type,
+            status_type == reverse_link.status_type,
             f"A link {link.link_id} and its symmetric link have conflicting status types.",
             TopologyException,
         )
 
         # Existing link must be connected to existing sites/sectors.
-        if link.status_type == StatusType.EXISTING:
+        if status_type == StatusType.EXISTING:
             planner_assert(
-                link.tx_site.status_type == StatusType.EXISTING
-                and link.rx_site.status_type == StatusType.EXISTING,
+                tx_site.status_type == StatusType.EXISTING
+                and rx_site.status_type == StatusType.EXISTING,
                 f"Existing link {link.link_id} must be connected to existing sites.",
                 TopologyException,
             )
-            planner_assert(
-                link.tx_sector is not None
-                and none_throws(link.tx_sector).status_type
-                == StatusType.EXISTING
-                and link.rx_sector is not None
-                and none_throws(link.rx_sector).status_type
-                == StatusType.EXISTING,
-                f"Existing link {link.link_id} must be connected to existing sectors.",
-                TopologyException,
-            )
+            # Sectors are not shared between the two directions, so check both
+            for checked_link in (link, reverse_link):
+                tx_sector = checked_link.tx_sector
+                rx_sector = checked_link.rx_sector
+                planner_assert(
+                    tx_sector is not None
+                    and tx_sector.status_type == StatusType.EXISTING
+                    and rx_sector is not None
+                    and rx_sector.status_type == StatusType.EXISTING,
+                    f"Existing link {checked_link.link_id} must be connected to existing sectors.",
+                    TopologyException,
+                )
         # Proposed link must be connected to active sites/sectors.
-        elif link.status_type == StatusType.PROPOSED:
+        elif status_type == StatusType.PROPOSED:
             planner_assert(
-                link.tx_site.status_type in StatusType.active_status()
-                and link.rx_site.status_type in StatusType.active_status(),
+                tx_site.status_type in active_status
+                and rx_site.status_type in active_status,
                 f"Active link {link.link_id} must be connected to active sites.",
                 TopologyException,
             )
-            planner_assert(
-                link.tx_sector is not None
-                and none_throws(link.tx_sector).status_type
-                in StatusType.active_status()
-                and link.rx_sector is not None
-                and none_throws(link.rx_sector).status_type
-                in StatusType.active_status(),
-                f"Active link {link.link_id} must be connected to active sectors.",
-                TopologyException,
-            )
+            for checked_link in (link, reverse_link):
+                tx_sector = checked_link.tx_sector
+                rx_sector = checked_link.rx_sector
+                planner_assert(
+                    tx_sector is not None
+                    and tx_sector.status_type in active_status
+                    and rx_sector is not None
+                    and rx_sector.status_type in active_status,
+                    f"Active link {checked_link.link_id} must be connected to active sectors.",
+                    TopologyException,
+                )
         # Candidate link cannot be connected to inactive sites/sectors.
-        elif link.status_type == StatusType.CANDIDATE:
+        elif status_type == StatusType.CANDIDATE:
             planner_assert(
-                link.tx_site.status_type not in StatusType.inactive_status()
-                and link.rx_site.status_type
-                not in StatusType.inactive_status(),
+                tx_site.status_type not in inactive_status
+                and rx_site.status_type not in inactive_status,
                 f"Candidate link {link.link_id} cannot be connected to inactive sites.",
                 TopologyException,
             )
-            planner_assert(
-                (
-                    link.tx_sector is None
-                    or none_throws(link.tx_sector).status_type
-                    not in StatusType.inactive_status()
+            for checked_link in (link, reverse_link):
+                tx_sector = checked_link.tx_sector
+                rx_sector = checked_link.rx_sector
+                planner_assert(
+                    (
+                        tx_sector is None
+                        or tx_sector.status_type not in inactive_status
+                    )
+                    and (
+                        rx_sector is None
+                        or rx_sector.status_type not in inactive_status
+                    ),
+                    f"Candidate link {checked_link.link_id} cannot be connected to inactive sectors.",
+                    TopologyException,
                 )
-                and (
-                    link.rx_sector is None
-                    or none_throws(link.rx_sector).status_type
-                    not in StatusType.inactive_status()
-                ),
-                f"Candidate link {link.link_id} cannot be connected to inactive sectors.",
-                TopologyException,
-            )
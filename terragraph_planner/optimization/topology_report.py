@@ -3,12 +3,28 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import json
 import logging
 import math
 import os
-from collections import Counter, defaultdict
-from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from collections import Counter, OrderedDict, defaultdict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+import networkx as nx
 import numpy as np
 import pandas as pd
 import yaml
@@ -23,6 +39,7 @@ from terragraph_planner.common.configuration.enums import (
     StatusType,
 )
 from terragraph_planner.common.data_io.data_key import (
+    DataKey,
     LinkKey,
     SectorKey,
     SiteKey,
@@ -30,7 +47,13 @@ from terragraph_planner.common.data_io.data_key import (
 from terragraph_planner.common.data_io.topology_serializer import (
     dump_topology_to_kml,
 )
+from terragraph_planner.common.exceptions import (
+    OptimizerException,
+    planner_assert,
+)
 from terragraph_planner.common.topology_models.link import Link
+from terragraph_planner.common.topology_models.sector import Sector
+from terragraph_planner.common.topology_models.site import Site
 from terragraph_planner.common.topology_models.topology import Topology
 from terragraph_planner.common.utils import current_system_params
 from terragraph_planner.optimization.constants import (
@@ -48,6 +71,7 @@ from terragraph_planner.optimization.ilp_models.flow_optimization import (
     MaxFlowNetwork,
 )
 from terragraph_planner.optimization.structs import (
+    ActiveLinkStatistics,
     AnalysisResult,
     AngleViolatingLinkPairs,
     AvailabilityMetrics,
@@ -55,9 +79,14 @@ from terragraph_planner.optimization.structs import (
     DemandMetrics,
     DisjointPath,
     FailureDisruption,
+    FailureDisruptions,
     FlowMetrics,
+    JsonValue,
     LinkMetrics,
     MetricStatistics,
+    ReportColumn,
+    ReportColumns,
+    ReportValue,
     RoutingSolution,
     TopologyCounts,
     TopologyMetrics,
@@ -80,19 +109,113 @@ from terragraph_planner.optimization.topology_operations import (
     hops_from_pops,
     update_link_caps_with_sinr,
 )
+from terragraph_planner.optimization.topology_preparation import (
+    validate_topology_status,
+)
+
+# Base dumper of the metrics, using libyaml if PyYAML is built with it
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeDumper as _Dumper
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# Shared result of link hash lookups for sectors and sites without links
+NO_LINK_HASHES: FrozenSet[str] = frozenset()
+
+# Number of distinct topologies whose graph traversal results are memoized
+GRAPH_RESULT_CACHE_SIZE: int = 8
+
+# Failure disruptions and hop counts memoized by graph and topology signature
+_failure_disruptions_cache: "OrderedDict[Hashable, FailureDisruptions]" = (
+    OrderedDict()
+)
+_hops_from_pops_cache: "OrderedDict[Hashable, Dict[str, int]]" = OrderedDict()
+
+# Result memoized by _get_memoized
+MemoizedResult = TypeVar("MemoizedResult")
+
+# Key of the failure disruptions, an edge or a site id
+DisruptionKey = TypeVar("DisruptionKey", Tuple[str, str], str)
+
+# Key of the metrics counts, e.g. an MCS, a channel or a SKU
+CountKey = TypeVar("CountKey", int, str)
+
+# Number of rows formatted at a time when writing a dataframe to csv
+CSV_CHUNK_SIZE: int = 65536
+
+# Formats the metrics file can be dumped in
+METRICS_FORMATS: Tuple[str, ...] = ("yaml", "json")
+
+# Types of the metrics tree nodes dumped as yaml mappings
+METRICS_NAMED_TUPLE_TYPES: Tuple[type, ...] = (
+    TopologyMetrics,
+    Capex,
+    TopologyCounts,
+    DemandMetrics,
+    FlowMetrics,
+    MetricStatistics,
+    LinkMetrics,
+    AvailabilityMetrics,
+    FailureDisruption,
+)
+
+# Site keys of the reported site columns, in their output order
+SITE_CSV_OUTPUT_KEYS: Tuple[SiteKey, ...] = tuple(SiteKey.csv_output_keys())
+
+# Site keys reported with 6 digits, other site floats are reported with 1
+SITE_LOCATION_KEYS: FrozenSet[SiteKey] = frozenset(
+    {SiteKey.LATITUDE, SiteKey.LONGITUDE, SiteKey.ALTITUDE}
+)
+
+# Reported columns whose values all have a known dtype
+LINK_COLUMN_DTYPES: Dict[LinkKey, Type[np.generic]] = {
+    LinkKey.VIOLATES_DIFF_SECTOR_ANGLE: np.bool_,
+    LinkKey.VIOLATES_NEAR_FAR: np.bool_,
+    LinkKey.VIOLATES_SECTOR_LIMIT: np.bool_,
+}
+SECTOR_COLUMN_DTYPES: Dict[SectorKey, Type[np.generic]] = {
+    SectorKey.AZIMUTH_ORIENTATION: np.float32,
+    SectorKey.ACTIVE_BACKHAUL_LINKS: np.int64,
+    SectorKey.ACTIVE_ACCESS_LINKS: np.int64,
+    SectorKey.VIOLATES_LINK_LOAD: np.bool_,
+}
+SITE_COLUMN_DTYPES: Dict[SiteKey, Type[np.generic]] = {
+    SiteKey.LATITUDE: np.float32,
+    SiteKey.LONGITUDE: np.float32,
+    SiteKey.ACTIVE_NODES: np.int64,
+    SiteKey.ACTIVE_SECTORS: np.int64,
+    SiteKey.ACTIVE_LINKS: np.int64,
+    SiteKey.OUTGOING_FLOW: np.float64,
+    SiteKey.INCOMING_FLOW: np.float64,
+}
+
 
 def analyze_with_dump(
-    topology: Topology, params: OptimizerParams
+    topology: Topology, params: OptimizerParams, metrics_format: str = "yaml"
 ) -> AnalysisResult:
+    """
+    Analyze a topology for report and dump the report files.
+
+    @param metrics_format
+    Format of the metrics file, "yaml" or "json". json is much faster to write
+    and to load when the metrics are consumed by programs instead of people.
+    """
+    planner_assert(
+        metrics_format in METRICS_FORMATS,
+        f"Metrics format must be one of {', '.join(METRICS_FORMATS)}",
+        OptimizerException,
+    )
     result = analyze(topology, params)
     dump_topology_to_kml(result.topology, OutputFile.REPORTING_TOPOLOGY)
     dump_df_to_csv(result.link_df, OutputFile.LINK)
-    dump_df_to_csv(result.site_df, OutputFile.SITE)
+    dump_df_to_csv(result.site_df, OutputFile.SITE, index=False)
     dump_df_to_csv(result.sector_df, OutputFile.SECTOR)
-    dump_metrics_to_yaml(result.metrics)
+    if metrics_format == "json":
+        dump_metrics_to_json(result.metrics)
+    else:
+        dump_metrics_to_yaml(result.metrics)
     return result
 
 
@@ -103,7 +226,39 @@ def analyze(
     """
     This function analyzes a topology for report.
     """
-    proposed_graph = build_digraph(topology, StatusType.active_status())
+    report = collect_report_columns(topology, params)
+    return AnalysisResult(
+        report.topology,
+        _build_report_df(report.link_columns, build_links_df),
+        _build_report_df(report.site_columns, build_sites_df),
+        _build_report_df(report.sector_columns, build_sectors_df),
+        report.metrics,
+    )
+
+
+def _build_report_df(
+    columns: Optional[Mapping[str, ReportColumn]],
+    build_df: Callable[[Mapping[str, ReportColumn]], pd.DataFrame],
+) -> pd.DataFrame:
+    return build_df(columns) if columns is not None else pd.DataFrame()
+
+
+def collect_report_columns(
+    topology: Topology,
+    params: OptimizerParams,
+) -> ReportColumns:
+    """
+    Analyze a topology for report and collect the reported columns of the
+    links, sites and sectors. The columns of a component are None if none of
+    them is active.
+    """
+    active_status = StatusType.active_status()
+    if not any(
+        site.status_type in active_status for site in topology.sites.values()
+    ):
+        return _analyze_topology_without_active_sites(topology, params)
+
+    proposed_graph = build_digraph(topology, active_status)
 
     # Compute optimal flow in the network
     if params.topology_routing is None:
@@ -119,10 +274,11 @@ def analyze(
     disjoint = disjoint_paths(topology, proposed_graph)
 
     # Compute edge/site failure disruptions
-    edge_failure_disruptions = single_edge_failures(proposed_graph)
-    pop_failure_disruptions, dn_failure_disruptions = single_site_failures(
-        proposed_graph
-    )
+    (
+        edge_failure_disruptions,
+        pop_failure_disruptions,
+        dn_failure_disruptions,
+    ) = _cached_failure_disruptions(proposed_graph)
 
     # Compute availability statistics
     if params.availability_sim_time > 0:
@@ -153,10 +309,13 @@ def analyze(
         topology, params.dn_dn_sector_limit, params.dn_total_sector_limit
     )
 
+    active_link_statistics = scan_active_links(topology)
+
     metrics = get_topology_metrics(
         topology=topology,
         params=params,
         routing_solution=flow_solution,
+        active_link_statistics=active_link_statistics,
         disjoint_paths=disjoint,
         edge_failure_disruptions=edge_failure_disruptions,
         pop_failure_disruptions=pop_failure_disruptions,
@@ -179,34 +338,192 @@ def analyze(
         + metrics.counts.active_access_links
         + metrics.counts.active_wired_links
     )
-    if total_active_links > 0:
-        link_df = build_links_df(
-            topology,
-            violating_links,
-            violating_sectors,
+    link_columns = (
+        collect_link_columns(topology, violating_links, violating_sectors)
+        if total_active_links > 0
+        else None
+    )
+    site_columns = (
+        collect_site_columns(topology, params, active_link_statistics)
+        if metrics.counts.active_sites > 0
+        else None
+    )
+    sector_columns = (
+        collect_sector_columns(
+            topology, violating_sectors, active_link_statistics
         )
-    else:
-        link_df = pd.DataFrame()
+        if metrics.counts.active_sectors > 0
+        else None
+    )
+    return ReportColumns(
+        topology, link_columns, site_columns, sector_columns, metrics
+    )
 
-    site_type_to_cost = {
-        SiteType.POP: params.pop_site_capex,
-        SiteType.DN: params.dn_site_capex,
-        SiteType.CN: params.cn_site_capex,
-    }
-    if metrics.counts.active_sites > 0:
-        site_df = build_sites_df(
-            topology,
-            site_type_to_cost,
+
+def _analyze_topology_without_active_sites(
+    topology: Topology, params: OptimizerParams
+) -> ReportColumns:
+    """
+    Analyze a topology that has no active site. There is no network to route
+    flow on or to fail, so skip the graph analyses and report the component
+    counts and capex only, with every demand disconnected. The topology is
+    still validated, like the flow network of a full analysis validates it.
+    """
+    validate_topology_status(topology)
+    edge_failure_disruptions = {}
+    pop_failure_disruptions = {}
+    dn_failure_disruptions = {}
+    metrics = get_topology_metrics(
+        topology=topology,
+        params=params,
+        routing_solution=None,
+        active_link_statistics=scan_active_links(topology),
+        disjoint_paths=DisjointPath(
+            demand_with_disjoint_paths=set(),
+            disconnected_demand_locations=set(topology.demand_sites),
+            demand_connected_to_pop=set(),
+        ),
+        edge_failure_disruptions=edge_failure_disruptions,
+        pop_failure_disruptions=pop_failure_disruptions,
+        dn_failure_disruptions=dn_failure_disruptions,
+        availability={},
+        violating_links=AngleViolatingLinkPairs(
+            diff_sector_list=[], near_far_list=[]
+        ),
+        violating_sectors={},
+    )
+    add_statistics_to_topology(
+        topology=topology,
+        routing_solution=None,
+        edge_failure_disruptions=edge_failure_disruptions,
+        pop_failure_disruptions=pop_failure_disruptions,
+        dn_failure_disruptions=dn_failure_disruptions,
+    )
+    return ReportColumns(topology, None, None, None, metrics)
+
+
+def get_graph_signature(graph: nx.DiGraph) -> Hashable:
+    """
+    Signature of the graph structure read by the edge and site failure
+    computations: the nodes with their site types and the edges with their
+    link types.
+    """
+    return (
+        frozenset(graph.nodes(data="site_type")),
+        frozenset(graph.edges(data="link_type")),
+    )
+
+
+def get_hop_signature(topology: Topology) -> Hashable:
+    """
+    Signature of the topology state read by hops_from_pops with the active
+    status filter: the active POPs, the active sites and the active links.
+    """
+    active_status = StatusType.active_status()
+    active_sites = frozenset(
+        site_id
+        for site_id, site in topology.sites.items()
+        if site.status_type in active_status
+    )
+    active_pops = frozenset(
+        site_id
+        for site_id in active_sites
+        if topology.sites[site_id].site_type == SiteType.POP
+    )
+    active_links = frozenset(
+        (link.tx_site.site_id, link.rx_site.site_id)
+        for link in topology.links.values()
+        if link.status_type in active_status
+    )
+    return (active_pops, active_sites, active_links)
+
+
+def _get_memoized(
+    cache: "OrderedDict[Hashable, MemoizedResult]",
+    signature: Hashable,
+    compute: Callable[[], MemoizedResult],
+) -> MemoizedResult:
+    """
+    Get the result memoized by signature in a least recently used cache, or
+    compute and memoize it. Only the signature is kept as key, so the cache
+    does not keep the topologies and graphs the results are computed from.
+    """
+    if signature in cache:
+        cache.move_to_end(signature)
+        return cache[signature]
+    result = compute()
+    cache[signature] = result
+    if len(cache) > GRAPH_RESULT_CACHE_SIZE:
+        cache.popitem(last=False)
+    return result
+
+
+def _cached_failure_disruptions(graph: nx.DiGraph) -> FailureDisruptions:
+    """
+    Edge, POP and DN failure disruptions of the graph, memoized by graph
+    signature. The memoized disruptions are copied, so the caller can mutate
+    the returned containers.
+    """
+    (
+        edge_failure_disruptions,
+        pop_failure_disruptions,
+        dn_failure_disruptions,
+    ) = _get_memoized(
+        _failure_disruptions_cache,
+        get_graph_signature(graph),
+        lambda: _compute_failure_disruptions(graph),
+    )
+    return (
+        _copy_disruptions(edge_failure_disruptions),
+        _copy_disruptions(pop_failure_disruptions),
+        _copy_disruptions(dn_failure_disruptions),
+    )
+
+
+def _compute_failure_disruptions(graph: nx.DiGraph) -> FailureDisruptions:
+    edge_failure_disruptions = single_edge_failures(graph)
+    pop_failure_disruptions, dn_failure_disruptions = single_site_failures(
+        graph
+    )
+    return (
+        edge_failure_disruptions,
+        pop_failure_disruptions,
+        dn_failure_disruptions,
+    )
+
+
+def _copy_disruptions(
+    disruptions: Dict[DisruptionKey, Set[str]]
+) -> Dict[DisruptionKey, Set[str]]:
+    """
+    Copy the failure disruptions down to the sets of disrupted sites.
+    """
+    return {key: set(disrupted) for key, disrupted in disruptions.items()}
+
+
+def _cached_hops_from_pops(topology: Topology) -> Dict[str, int]:
+    """
+    Hop counts from the active POPs, memoized by the active topology
+    signature. The memoized hop counts are copied, so the caller can mutate
+    the returned dict.
+    """
+    return dict(
+        _get_memoized(
+            _hops_from_pops_cache,
+            get_hop_signature(topology),
+            lambda: hops_from_pops(
+                topology, status_filter=StatusType.active_status()
+            ),
         )
-    else:
-        site_df = pd.DataFrame()
+    )
 
-    if metrics.counts.active_sectors > 0:
-        sector_df = build_sectors_df(topology, violating_sectors)
-    else:
-        sector_df = pd.DataFrame()
 
-    return AnalysisResult(topology, link_df, site_df, sector_df, metrics)
+def clear_graph_result_caches() -> None:
+    """
+    Clear the memoized failure disruptions and hop counts.
+    """
+    _failure_disruptions_cache.clear()
+    _hops_from_pops_cache.clear()
 
 
 def get_routing_flow_solution(
@@ -219,38 +536,56 @@ def get_routing_flow_solution(
     flow_solution = MaxFlowNetwork(topology, params).solve()
     if flow_solution is None:
         return None
-    flows = {}
-    active_link_utilization = {}
-
-    # Most links in topology are bi-directional (i.e. all DN-DN links).
-    # However, in our reports we show one value per physical link.
+    active_status = StatusType.active_status()
+    link_keys = []
+    link_flows = []
+    link_capacities = []
+    flow_decisions = flow_solution.flow_decisions
     for link in topology.links.values():
+        if link.status_type not in active_status:
+            continue
         link_key = (link.tx_site.site_id, link.rx_site.site_id)
-        flow_val = flow_solution.flow_decisions.get(link_key, 0)
-        flows[link_key] = flow_val
-        rev_link_key = (link.rx_site.site_id, link.tx_site.site_id)
+        link_keys.append(link_key)
+        link_flows.append(flow_decisions.get(link_key, 0))
+        link_capacities.append(link.capacity)
+    flow_array = np.array(link_flows, dtype=float)
+    capacity_array = np.array(link_capacities, dtype=float)
+    has_capacity = capacity_array > 0
+    util = np.divide(
+        flow_array,
+        capacity_array,
+        out=np.zeros_like(flow_array),
+        where=has_capacity,
+    )
+    percent_capacities = (100 * util).tolist()
+    # Links without capacity are reported with an integer zero utilization
+    for link_idx in np.flatnonzero(~has_capacity):
+        percent_capacities[link_idx] = 0
 
+    # Most links in topology are bi-directional (i.e. all DN-DN links).
+    # However, in our reports we show one value per physical link.
+    active_link_utilization = {}
+    for link_key, percent_capacity in zip(link_keys, percent_capacities):
         # For active bi-directional links, one flow should be 0 and the other
         # might not be. Store the non-zero value in active_link_utilization.
         # If they are both 0, store just one (does not matter which)
-        if link.status_type in StatusType.active_status():
-            util = flow_val / link.capacity if link.capacity > 0 else 0
-            percent_capacity = 100 * util
+        rev_link_key = (link_key[1], link_key[0])
+        rev_percent_capacity = active_link_utilization.get(rev_link_key)
+        if rev_percent_capacity is None:
             active_link_utilization[link_key] = percent_capacity
-            if rev_link_key in active_link_utilization:
-                rev_percent_capacity = active_link_utilization[rev_link_key]
-                if math.isclose(
-                    percent_capacity, 0, abs_tol=EPSILON
-                ) or math.isclose(rev_percent_capacity, 0, abs_tol=EPSILON):
-                    if percent_capacity > rev_percent_capacity:
-                        active_link_utilization.pop(rev_link_key)
-                    else:
-                        active_link_utilization.pop(link_key)
-                else:
-                    logger.warning(
-                        "Something is wonky with flow optimization: "
-                        "both bidirectional links have non-zero flow."
-                    )
+        elif (
+            abs(percent_capacity) <= EPSILON
+            or abs(rev_percent_capacity) <= EPSILON
+        ):
+            if percent_capacity > rev_percent_capacity:
+                del active_link_utilization[rev_link_key]
+                active_link_utilization[link_key] = percent_capacity
+        else:
+            active_link_utilization[link_key] = percent_capacity
+            logger.warning(
+                "Something is wonky with flow optimization: "
+                "both bidirectional links have non-zero flow."
+            )
 
     return RoutingSolution(
         flow_solution=flow_solution,
@@ -285,35 +620,110 @@ def add_statistics_to_topology(
     @param graph: The networkx graph based on the topology.
     @param routing_solution: The maximum flow solution based on routing selection.
     """
+    if routing_solution:
+        flow_decisions = routing_solution.flow_solution.flow_decisions
+        active_link_utilization = routing_solution.active_link_utilization
+    else:
+        flow_decisions = {}
+        active_link_utilization = {}
+    active_status = StatusType.active_status()
     for link in topology.links.values():
-        if link.status_type in StatusType.active_status():
+        if link.status_type in active_status:
             link_key = (link.tx_site.site_id, link.rx_site.site_id)
-            link.proposed_flow = (
-                routing_solution.flow_solution.flow_decisions.get(link_key, 0.0)
-                if routing_solution
-                else 0.0
-            )
-            link.utilization = (
-                routing_solution.active_link_utilization.get(link_key, 0.0)
-                if routing_solution
-                else 0.0
-            )
+            link.proposed_flow = flow_decisions.get(link_key, 0.0)
+            link.utilization = active_link_utilization.get(link_key, 0.0)
             link.breakdowns = len(edge_failure_disruptions.get(link_key, []))
 
     for site in topology.sites.values():
+        site_type = site.site_type
         site.breakdowns = (
             len(pop_failure_disruptions.get(site.site_id, []))
-            if site.site_type == SiteType.POP
+            if site_type == SiteType.POP
             else len(dn_failure_disruptions.get(site.site_id, []))
-            if site.site_type == SiteType.DN
+            if site_type == SiteType.DN
             else 0
         )
 
 
+def scan_active_links(topology: Topology) -> ActiveLinkStatistics:
+    """
+    Collect the per-sector, per-site and per-link-type statistics of the
+    active links in a single pass over the topology links.
+    """
+    active_status = StatusType.active_status()
+    # Only the sectors and sites with active links get an entry
+    backhaul_links_per_sector = defaultdict(set)
+    access_links_per_sector = defaultdict(set)
+    wireless_links_per_site = defaultdict(set)
+    backhaul_link_dist = []
+    access_link_dist = []
+    backhaul_link_mcs = {}
+    access_link_mcs = {}
+    for link in topology.links.values():
+        if link.status_type not in active_status:
+            continue
+        link_type = link.link_type
+        if link_type == LinkType.WIRELESS_BACKHAUL:
+            links_per_sector = backhaul_links_per_sector
+            backhaul_link_dist.append(link.distance)
+            backhaul_link_mcs[link.sorted_site_ids] = link.mcs_level
+        elif link_type == LinkType.WIRELESS_ACCESS:
+            links_per_sector = access_links_per_sector
+            access_link_dist.append(link.distance)
+            access_link_mcs[link.sorted_site_ids] = link.mcs_level
+        else:
+            continue
+
+        # The pair of bi-direction links have the same 'link_hash' and they
+        # would be counted as 1 per sector and per site
+        link_hash = link.link_hash
+        links_per_sector[none_throws(link.tx_sector).sector_id].add(link_hash)
+        links_per_sector[none_throws(link.rx_sector).sector_id].add(link_hash)
+        wireless_links_per_site[link.tx_site.site_id].add(link_hash)
+        wireless_links_per_site[link.rx_site.site_id].add(link_hash)
+    return ActiveLinkStatistics(
+        backhaul_links_per_sector=backhaul_links_per_sector,
+        access_links_per_sector=access_links_per_sector,
+        wireless_links_per_site=wireless_links_per_site,
+        backhaul_link_dist=backhaul_link_dist,
+        access_link_dist=access_link_dist,
+        backhaul_link_mcs=backhaul_link_mcs,
+        access_link_mcs=access_link_mcs,
+    )
+
+
+def get_metric_statistics(
+    values: Sequence[float], total_count: Optional[int] = None
+) -> MetricStatistics:
+    """
+    Compute the average, maximum and minimum of the values.
+
+    @param values
+    The values to compute the statistics of.
+
+    @param total_count
+    The number of components the values are collected from, if it can be larger
+    than the number of values. The components without a value are taken as 0.0
+    in the average and the minimum. Defaults to the number of values.
+    """
+    count = len(values) if total_count is None else total_count
+    if len(values) == 0:
+        return MetricStatistics(avg=0.0, max=0.0, min=0.0)
+    values_array = np.asarray(values)
+    return MetricStatistics(
+        # Python sum keeps the summation order of the reported averages,
+        # numpy sums pairwise which can change their last digit
+        avg=sum(values) / count if count > 0 else 0.0,
+        max=values_array.max().item(),
+        min=values_array.min().item() if len(values) == count else 0.0,
+    )
+
+
 def get_topology_metrics(
     topology: Topology,
     params: OptimizerParams,
     routing_solution: Optional[RoutingSolution],
+    active_link_statistics: ActiveLinkStatistics,
     disjoint_paths: DisjointPath,
     edge_failure_disruptions: Dict[Tuple[str, str], Set[str]],
     pop_failure_disruptions: Dict[str, Set[str]],
@@ -370,7 +780,7 @@ def get_topology_metrics(
         total_demand_oversubscribed=total_demand / params.oversubscription,
     )
     if routing_solution is not None:
-        active_link_utilization = (
+        active_link_utilization = list(
             routing_solution.active_link_utilization.values()
         )
         flow_solution = routing_solution.flow_solution
@@ -378,64 +788,32 @@ def get_topology_metrics(
             total_bandwidth=flow_solution.buffer_decision
             * len(flow_solution.connected_demand_sites),
             minimum_bandwdith_for_connected_demand=flow_solution.buffer_decision,
-            link_capacity_utilization=MetricStatistics(
-                avg=sum(active_link_utilization) / len(active_link_utilization),
-                max=max(active_link_utilization),
-                min=min(active_link_utilization),
+            link_capacity_utilization=get_metric_statistics(
+                active_link_utilization
             ),
         )
     else:
         flow_metrics = None
 
     # Add flow metrics
-    backhaul_link_dist = [
-        link.distance
-        for link in topology.links.values()
-        if link.link_type == LinkType.WIRELESS_BACKHAUL
-        and link.status_type in StatusType.active_status()
-    ]
-    access_link_dist = [
-        link.distance
-        for link in topology.links.values()
-        if link.link_type == LinkType.WIRELESS_ACCESS
-        and link.status_type in StatusType.active_status()
-    ]
+    backhaul_link_dist = active_link_statistics.backhaul_link_dist
+    access_link_dist = active_link_statistics.access_link_dist
 
-    active_backhaul_links_by_dn_sector = {
-        s.sector_id: set()
-        for s in topology.sectors.values()
-        if s.sector_type == SectorType.DN
-        and s.status_type in StatusType.active_status()
-    }
-    active_access_links_by_dn_sector = {
-        s.sector_id: set()
+    active_status = StatusType.active_status()
+    active_dn_sector_ids = [
+        s.sector_id
         for s in topology.sectors.values()
-        if s.sector_type == SectorType.DN
-        and s.status_type in StatusType.active_status()
-    }
-    for link in topology.links.values():
-        if link.status_type in StatusType.active_status():
-            tx_sector = none_throws(link.tx_sector)
-            rx_sector = none_throws(link.rx_sector)
-
-            # The pair of bi-direction backhaul links have the same 'link_hash'
-            # and they would be counted as 1 per sector
-            if link.link_type == LinkType.WIRELESS_BACKHAUL:
-                active_backhaul_links_by_dn_sector[tx_sector.sector_id].add(
-                    link.link_hash
-                )
-                active_backhaul_links_by_dn_sector[rx_sector.sector_id].add(
-                    link.link_hash
-                )
-            elif link.link_type == LinkType.WIRELESS_ACCESS:
-                active_access_links_by_dn_sector[tx_sector.sector_id].add(
-                    link.link_hash
-                )
+        if s.sector_type == SectorType.DN and s.status_type in active_status
+    ]
+    backhaul_links_per_sector = active_link_statistics.backhaul_links_per_sector
+    access_links_per_sector = active_link_statistics.access_links_per_sector
     dn_sector_active_backhaul_links = [
-        len(v) for v in active_backhaul_links_by_dn_sector.values()
+        len(backhaul_links_per_sector.get(sector_id, NO_LINK_HASHES))
+        for sector_id in active_dn_sector_ids
     ]
     dn_sector_active_access_links = [
-        len(v) for v in active_access_links_by_dn_sector.values()
+        len(access_links_per_sector.get(sector_id, NO_LINK_HASHES))
+        for sector_id in active_dn_sector_ids
     ]
 
     active_dn_sectors = (
@@ -443,109 +821,36 @@ def get_topology_metrics(
         + component_counts.active_dn_sectors_on_dns
     )
 
-    avg_backhaul_links_per_sector = (
-        sum(dn_sector_active_backhaul_links) / active_dn_sectors
-        if active_dn_sectors > 0
-        else 0.0
-    )
-    max_backhaul_links_per_sector = (
-        max(dn_sector_active_backhaul_links)
-        if len(dn_sector_active_backhaul_links) > 0
-        else 0
-    )
-    min_backhaul_links_per_sector = (
-        min(dn_sector_active_backhaul_links)
-        if len(dn_sector_active_backhaul_links) > 0
-        else 0
-    )
-    avg_access_links_per_sector = (
-        sum(dn_sector_active_access_links) / active_dn_sectors
-        if active_dn_sectors > 0
-        else 0.0
-    )
-    max_access_links_per_sector = (
-        max(dn_sector_active_access_links)
-        if len(dn_sector_active_access_links) > 0
-        else 0
-    )
-    min_access_links_per_sector = (
-        min(dn_sector_active_access_links)
-        if len(dn_sector_active_access_links) > 0
-        else 0
-    )
-
     backhaul_link = LinkMetrics(
         active_count=component_counts.active_backhaul_links,
-        links_per_sector=MetricStatistics(
-            avg=avg_backhaul_links_per_sector,
-            max=max_backhaul_links_per_sector,
-            min=min_backhaul_links_per_sector,
-        ),
-        link_dist=MetricStatistics(
-            avg=sum(backhaul_link_dist) / len(backhaul_link_dist)
-            if len(backhaul_link_dist) > 0
-            else 0,
-            max=max(backhaul_link_dist) if len(backhaul_link_dist) > 0 else 0,
-            min=min(backhaul_link_dist) if len(backhaul_link_dist) > 0 else 0,
+        links_per_sector=get_metric_statistics(
+            dn_sector_active_backhaul_links, active_dn_sectors
         ),
+        link_dist=get_metric_statistics(backhaul_link_dist),
     )
     access_link = LinkMetrics(
         active_count=component_counts.active_access_links,
-        links_per_sector=MetricStatistics(
-            avg=avg_access_links_per_sector,
-            max=max_access_links_per_sector,
-            min=min_access_links_per_sector,
-        ),
-        link_dist=MetricStatistics(
-            avg=sum(access_link_dist) / len(access_link_dist)
-            if len(access_link_dist) > 0
-            else 0,
-            max=max(access_link_dist) if len(access_link_dist) > 0 else 0,
-            min=min(access_link_dist) if len(access_link_dist) > 0 else 0,
+        links_per_sector=get_metric_statistics(
+            dn_sector_active_access_links, active_dn_sectors
         ),
+        link_dist=get_metric_statistics(access_link_dist),
     )
 
-    backhaul_link_mcs = {}
-    access_link_mcs = {}
-    for link in topology.links.values():
-        if link.status_type not in StatusType.active_status():
-            continue
-        if link.link_type == LinkType.WIRELESS_BACKHAUL:
-            backhaul_link_mcs[link.sorted_site_ids] = link.mcs_level
-        elif link.link_type == LinkType.WIRELESS_ACCESS:
-            access_link_mcs[link.sorted_site_ids] = link.mcs_level
-    backhaul_mcs = Counter(sorted(backhaul_link_mcs.values()))
-    access_mcs = Counter(sorted(access_link_mcs.values()))
+    backhaul_link_mcs = active_link_statistics.backhaul_link_mcs
+    access_link_mcs = active_link_statistics.access_link_mcs
+    backhaul_mcs = Counter(backhaul_link_mcs.values())
+    access_mcs = Counter(access_link_mcs.values())
 
     # Add failure disruption
     edge_failures = [len(v) for v in edge_failure_disruptions.values()]
-    edge_fail_effect = MetricStatistics(
-        avg=sum(edge_failures) / len(edge_failures)
-        if len(edge_failures) > 0
-        else 0,
-        max=max(edge_failures) if len(edge_failures) > 0 else 0,
-        min=min(edge_failures) if len(edge_failures) > 0 else 0,
-    )
-
+    edge_fail_effect = get_metric_statistics(edge_failures)
     pop_failures = [len(v) for v in pop_failure_disruptions.values()]
-    pop_fail_effect = MetricStatistics(
-        avg=sum(pop_failures) / component_counts.active_pop_sites,
-        max=max(pop_failures) if len(pop_failures) > 0 else 0,
-        min=min(pop_failures)
-        if len(pop_failures) > 0
-        and len(pop_failures) == component_counts.active_pop_sites
-        else 0,
+    pop_fail_effect = get_metric_statistics(
+        pop_failures, component_counts.active_pop_sites
     )
     dn_failures = [len(v) for v in dn_failure_disruptions.values()]
-    dn_fail_effect = MetricStatistics(
-        avg=sum(dn_failures) / component_counts.active_dn_sites
-        if component_counts.active_dn_sites > 0
-        else 0,
-        max=max(dn_failures) if len(dn_failures) > 0 else 0,
-        min=min(dn_failures)
-        if len(dn_failures) > 0
-        and len(dn_failures) == component_counts.active_dn_sites
-        else 0,
+    dn_fail_effect = get_metric_statistics(
+        dn_failures, component_counts.active_dn_sites
     )
     failure_disruption = FailureDisruption(
         edge_fail_effect=edge_fail_effect,
@@ -554,19 +859,20 @@ def get_topology_metrics(
     )
 
     # Average availability
-    availability_vals = np.array(list(availability.values()), dtype=float)
-    avg_availability = (
-        100.0 * float(np.mean(availability_vals))
-        if len(availability_vals) > 0
-        else 0
-    )
     percentiles = [0, 25, 50, 75, 100]
-    availability_numbers = {
-        p: 100.0 * float(np.percentile(availability_vals, p))
-        if len(availability_vals) > 0
-        else 0
-        for p in percentiles
-    }
+    if len(availability) > 0:
+        availability_vals = np.fromiter(
+            availability.values(), dtype=float, count=len(availability)
+        )
+        avg_availability = 100.0 * float(np.mean(availability_vals))
+        # A single call computes all percentiles from one sort of the values
+        percentile_vals = np.percentile(availability_vals, percentiles)
+        availability_numbers = {
+            p: 100.0 * float(v) for p, v in zip(percentiles, percentile_vals)
+        }
+    else:
+        avg_availability = 0
+        availability_numbers = {p: 0 for p in percentiles}
     availability_metrics = AvailabilityMetrics(
         avg=avg_availability, percentiles=availability_numbers
     )
@@ -590,14 +896,14 @@ def get_topology_metrics(
     )
 
 
-def build_links_df(
+def collect_link_columns(
     topology: Topology,
     violating_links: AngleViolatingLinkPairs,
     violating_sectors: Dict[str, List[str]],
-) -> pd.DataFrame:
+) -> Dict[str, List[ReportValue]]:
     """
-    A function for building a pandas dataframe storing reported info about all
-    links being reported on.
+    A function for collecting the columns of reported info about all links
+    being reported on.
     """
 
     def _get_sector_identifier(link: Link) -> str:
@@ -607,272 +913,405 @@ def build_links_df(
             return "UNKNOWN"
         return f"{link.tx_sector.sector_id} --> {link.rx_sector.sector_id}"
 
+    def _get_channel(link: Link) -> str:
+        return (
+            str(link.link_channel)
+            if link.link_channel > UNASSIGNED_CHANNEL
+            else "UNASSIGNED"
+        )
+
+    def _violates_diff_sector_angle(link: Link) -> bool:
+        return link.link_id in diff_sector_violating_links
+
+    def _violates_near_far(link: Link) -> bool:
+        return link.link_id in near_far_violating_links
+
+    def _violates_sector_limit(link: Link) -> bool:
+        return (
+            link.tx_sector is not None
+            and link.tx_sector.sector_id in violating_sectors
+        )
+
     diff_sector_violating_links = get_violating_link_ids(
         topology, violating_links.diff_sector_list
     )
     near_far_violating_links = get_violating_link_ids(
         topology, violating_links.near_far_list
     )
+    # Keys whose reported value is not the attribute value of the link
+    value_overrides: Dict[LinkKey, Callable[[Link], ReportValue]] = {
+        LinkKey.SECTORS: _get_sector_identifier,
+        LinkKey.CHANNEL: _get_channel,
+        LinkKey.VIOLATES_DIFF_SECTOR_ANGLE: _violates_diff_sector_angle,
+        LinkKey.VIOLATES_NEAR_FAR: _violates_near_far,
+        LinkKey.VIOLATES_SECTOR_LIMIT: _violates_sector_limit,
+    }
     # initialize our columns and dataframe before populating it
-    raw_links = {}
-    for link_id, link in topology.links.items():
-        link_keys = {}
-        for link_key in LinkKey.csv_output_keys():
-            output_name, output_value = link_key.get_output_name_and_value(
-                link, digits_for_float=2, xml_output=False
-            )
-            if link_key == LinkKey.SECTORS:
-                output_value = _get_sector_identifier(link)
-            elif link_key == LinkKey.CHANNEL:
-                output_value = (
-                    str(link.link_channel)
-                    if link.link_channel > UNASSIGNED_CHANNEL
-                    else "UNASSIGNED"
-                )
-            elif link_key == LinkKey.VIOLATES_DIFF_SECTOR_ANGLE:
-                output_value = link.link_id in diff_sector_violating_links
-            elif link_key == LinkKey.VIOLATES_NEAR_FAR:
-                output_value = link_id in near_far_violating_links
-            elif link_key == LinkKey.VIOLATES_SECTOR_LIMIT:
-                output_value = (
-                    link.tx_sector is not None
-                    and link.tx_sector.sector_id in violating_sectors
+    link_keys = LinkKey.csv_output_keys()
+    columns: Dict[str, List[ReportValue]] = {
+        link_key.value.output_name: [] for link_key in link_keys
+    }
+    for link in topology.links.values():
+        for link_key in link_keys:
+            value_override = value_overrides.get(link_key)
+            if value_override is None:
+                _, output_value = link_key.get_output_name_and_value(
+                    link, digits_for_float=2, xml_output=False
                 )
-            link_keys[output_name] = output_value
-        raw_links[link_id] = link_keys
+            else:
+                output_value = value_override(link)
+            columns[link_key.value.output_name].append(output_value)
+
+    return columns
+
 
+def build_links_df(link_columns: Mapping[str, ReportColumn]) -> pd.DataFrame:
+    """
+    A function for building a pandas dataframe storing reported info about all
+    links being reported on.
+    """
     # links here are problematic, they are doubles between sites.
-    list_of_series = [pd.Series(raw_links[i]) for i in raw_links]
-    links_df = pd.DataFrame(list_of_series).set_index(
-        LinkKey.LINK_GEOHASH.value.output_name
-    )
+    links_df = build_df_from_columns(
+        link_columns, LINK_COLUMN_DTYPES
+    ).set_index(LinkKey.LINK_GEOHASH.value.output_name)
 
     return links_df
 
 
-def build_sectors_df(
-    topology: Topology, violating_sectors: Dict[str, List[str]]
-) -> pd.DataFrame:
+def collect_sector_columns(
+    topology: Topology,
+    violating_sectors: Dict[str, List[str]],
+    active_link_statistics: ActiveLinkStatistics,
+) -> Dict[str, List[ReportValue]]:
     """
-    A function for building a pandas dataframe storing reported info about all
-    sectors being reported on.
+    A function for collecting the columns of reported info about all sectors
+    being reported on.
     """
-    # initialize our columns and dataframe before populating it
-    active_backhaul_links_per_sector = {
-        s.sector_id: set() for s in topology.sectors.values()
+    active_backhaul_links_per_sector = (
+        active_link_statistics.backhaul_links_per_sector
+    )
+    active_access_links_per_sector = (
+        active_link_statistics.access_links_per_sector
+    )
+
+    def _get_channel(sector: Sector) -> str:
+        return (
+            str(sector.channel)
+            if sector.channel > UNASSIGNED_CHANNEL
+            else "UNASSIGNED"
+        )
+
+    def _violates_link_load(sector: Sector) -> bool:
+        return sector.sector_id in violating_sectors
+
+    # Keys whose reported value is not the attribute value of the sector
+    value_overrides: Dict[SectorKey, Callable[[Sector], ReportValue]] = {
+        SectorKey.CHANNEL: _get_channel,
+        SectorKey.ACTIVE_BACKHAUL_LINKS: lambda sector: len(
+            active_backhaul_links_per_sector.get(
+                sector.sector_id, NO_LINK_HASHES
+            )
+        ),
+        SectorKey.ACTIVE_ACCESS_LINKS: lambda sector: len(
+            active_access_links_per_sector.get(sector.sector_id, NO_LINK_HASHES)
+        ),
+        SectorKey.VIOLATES_LINK_LOAD: _violates_link_load,
     }
-    active_access_links_per_sector = {
-        s.sector_id: set() for s in topology.sectors.values()
+    # initialize our columns and dataframe before populating it
+    sector_keys = SectorKey.csv_output_keys()
+    columns: Dict[str, List[ReportValue]] = {
+        sector_key.value.output_name: [] for sector_key in sector_keys
     }
-    for link in topology.links.values():
-        if link.status_type in StatusType.active_status():
-            if link.link_type == LinkType.WIRELESS_BACKHAUL:
-                active_backhaul_links_per_sector[
-                    none_throws(link.tx_sector).sector_id
-                ].add(link.link_hash)
-                active_backhaul_links_per_sector[
-                    none_throws(link.rx_sector).sector_id
-                ].add(link.link_hash)
-            elif link.link_type == LinkType.WIRELESS_ACCESS:
-                active_access_links_per_sector[
-                    none_throws(link.tx_sector).sector_id
-                ].add(link.link_hash)
-                active_access_links_per_sector[
-                    none_throws(link.rx_sector).sector_id
-                ].add(link.link_hash)
-    raw_sectors = {}
-    for sector_id, sector in topology.sectors.items():
-        if sector.status_type in StatusType.active_status():
-            sector_keys = {}
-            for sector_key in SectorKey.csv_output_keys():
-                (
-                    output_name,
-                    output_value,
-                ) = sector_key.get_output_name_and_value(
-                    sector, digits_for_float=1, xml_output=False
-                )
-
-                if sector_key == SectorKey.CHANNEL:
-                    output_value = (
-                        str(sector.channel)
-                        if sector.channel > UNASSIGNED_CHANNEL
-                        else "UNASSIGNED"
-                    )
-                elif sector_key == SectorKey.ACTIVE_BACKHAUL_LINKS:
-                    output_value = len(
-                        active_backhaul_links_per_sector[sector_id]
-                    )
-                elif sector_key == SectorKey.ACTIVE_ACCESS_LINKS:
-                    output_value = len(
-                        active_access_links_per_sector[sector_id]
+    active_status = StatusType.active_status()
+    for sector in topology.sectors.values():
+        if sector.status_type in active_status:
+            for sector_key in sector_keys:
+                value_override = value_overrides.get(sector_key)
+                if value_override is None:
+                    _, output_value = sector_key.get_output_name_and_value(
+                        sector, digits_for_float=1, xml_output=False
                     )
-                elif sector_key == SectorKey.VIOLATES_LINK_LOAD:
-                    output_value = sector_id in violating_sectors
-                sector_keys[output_name] = output_value
-            raw_sectors[sector_id] = sector_keys
+                else:
+                    output_value = value_override(sector)
+                columns[sector_key.value.output_name].append(output_value)
 
-    list_of_series = [pd.Series(raw_sectors[i]) for i in raw_sectors]
-    sectors_df = pd.DataFrame(list_of_series).set_index(
-        SectorKey.SECTOR_ID.value.output_name
-    )
+    return columns
 
-    numeric_cols = [
-        SectorKey.AZIMUTH_ORIENTATION.value.output_name,
-    ]
-    sectors_df[numeric_cols] = sectors_df[numeric_cols].astype(np.float32)
+
+def build_sectors_df(
+    sector_columns: Mapping[str, ReportColumn]
+) -> pd.DataFrame:
+    """
+    A function for building a pandas dataframe storing reported info about all
+    sectors being reported on.
+    """
+    sectors_df = build_df_from_columns(
+        sector_columns, SECTOR_COLUMN_DTYPES
+    ).set_index(SectorKey.SECTOR_ID.value.output_name)
     return sectors_df
 
 
 def site_flow_statistics(
     topology: Topology,
-) -> Dict[str, Dict[str, float]]:
+) -> Tuple[Dict[str, float], Dict[str, float]]:
     """
     Calculate outgoing/incoming flow for each site
     """
-    site_flow = defaultdict(lambda: {"incoming": 0.0, "outgoing": 0.0})
+    site_index = {site_id: i for i, site_id in enumerate(topology.sites)}
+    tx_site_indices = []
+    rx_site_indices = []
+    link_flows = []
+    demand_sites = topology.demand_sites
+    active_status = StatusType.active_status()
     for link in topology.links.values():
-        if link.status_type not in StatusType.active_status():
+        if link.status_type not in active_status:
             continue
-        if link.tx_site.site_id is SUPERSOURCE:
+        tx_site_id = link.tx_site.site_id
+        if tx_site_id is SUPERSOURCE:
             continue
-        if link.rx_site.site_id in topology.demand_sites:
+        rx_site_id = link.rx_site.site_id
+        if rx_site_id in demand_sites:
             continue
-        site_flow[link.tx_site.site_id]["outgoing"] += link.proposed_flow
-        site_flow[link.rx_site.site_id]["incoming"] += link.proposed_flow
-    return site_flow
+        tx_site_indices.append(site_index[tx_site_id])
+        rx_site_indices.append(site_index[rx_site_id])
+        link_flows.append(link.proposed_flow)
+
+    # Sum the link flows per site with one unbuffered scatter-add per direction
+    outgoing_flow = np.zeros(len(site_index))
+    incoming_flow = np.zeros(len(site_index))
+    np.add.at(outgoing_flow, tx_site_indices, link_flows)
+    np.add.at(incoming_flow, rx_site_indices, link_flows)
+    return (
+        dict(zip(site_index, outgoing_flow.tolist())),
+        dict(zip(site_index, incoming_flow.tolist())),
+    )
 
 
-def build_sites_df(
-    topology: Topology, site_type_to_cost: Dict[SiteType, float]
-) -> pd.DataFrame:
+def collect_site_columns(
+    topology: Topology,
+    params: OptimizerParams,
+    active_link_statistics: ActiveLinkStatistics,
+) -> Dict[str, ReportColumn]:
     """
-    A function for building a pandas dataframe storing reported info about all
-    sites being reported on.
+    A function for collecting the columns of reported info about all sites
+    being reported on.
     """
     active_nodes_per_site = {s.site_id: set() for s in topology.sites.values()}
     active_sectors_per_site = {
         s.site_id: set() for s in topology.sites.values()
     }
+    active_status = StatusType.active_status()
     for sector in topology.sectors.values():
-        if sector.status_type in StatusType.active_status():
-            active_nodes_per_site[sector.site.site_id].add(sector.node_id)
-            active_sectors_per_site[sector.site.site_id].add(sector.sector_id)
-    active_links_per_site = {s.site_id: set() for s in topology.sites.values()}
-    for link in topology.links.values():
-        if (
-            link.status_type in StatusType.active_status()
-            and link.link_type != LinkType.ETHERNET
-        ):
-            active_links_per_site[link.tx_site.site_id].add(link.link_hash)
-            active_links_per_site[link.rx_site.site_id].add(link.link_hash)
-
-    hop_counts = hops_from_pops(
-        topology, status_filter=StatusType.active_status()
-    )
-    site_flow = site_flow_statistics(topology)
-    # initialize our columns and dataframe before populating it
-    raw_sites = {}
-    for site_id, site in topology.sites.items():
-        site_keys = {}
-        for site_key in SiteKey.csv_output_keys():
-            if site_key in {
-                SiteKey.LATITUDE,
-                SiteKey.LONGITUDE,
-                SiteKey.ALTITUDE,
-            }:
-                output_name, output_value = site_key.get_output_name_and_value(
-                    site,
-                    digits_for_float=6,
-                    xml_output=False,
-                )
-            else:
-                output_name, output_value = site_key.get_output_name_and_value(
+        if sector.status_type in active_status:
+            site_id = sector.site.site_id
+            active_nodes_per_site[site_id].add(sector.node_id)
+            active_sectors_per_site[site_id].add(sector.sector_id)
+    active_links_per_site = active_link_statistics.wireless_links_per_site
+
+    hop_counts = _cached_hops_from_pops(topology)
+    outgoing_flow, incoming_flow = site_flow_statistics(topology)
+    pop_site_capex: float = params.pop_site_capex
+    dn_site_capex: float = params.dn_site_capex
+    cn_site_capex: float = params.cn_site_capex
+
+    def _get_site_capex(site: Site) -> float:
+        site_type = site.site_type
+        if site_type == SiteType.POP:
+            return pop_site_capex
+        elif site_type == SiteType.DN:
+            return dn_site_capex
+        return cn_site_capex
+
+    # Keys whose reported value is not the attribute value of the site
+    value_overrides: Dict[SiteKey, Callable[[Site], ReportValue]] = {
+        SiteKey.SITE_CAPEX: _get_site_capex,
+        SiteKey.ACTIVE_NODES: lambda site: len(
+            active_nodes_per_site[site.site_id]
+        ),
+        SiteKey.ACTIVE_SECTORS: lambda site: len(
+            active_sectors_per_site[site.site_id]
+        ),
+        SiteKey.ACTIVE_LINKS: lambda site: len(
+            active_links_per_site.get(site.site_id, NO_LINK_HASHES)
+        ),
+        SiteKey.HOPS_TO_NEAREST_POP: lambda site: hop_counts.get(
+            site.site_id, "disconnected"
+        ),
+        SiteKey.OUTGOING_FLOW: lambda site: outgoing_flow[site.site_id],
+        SiteKey.INCOMING_FLOW: lambda site: incoming_flow[site.site_id],
+    }
+    sites = list(topology.sites.values())
+    # Report the names as they are, unless no site is named
+    if any(site.name for site in sites):
+        value_overrides[SiteKey.NAME] = lambda site: site.name
+
+    # populate the columns one at a time over all sites
+    columns: Dict[str, ReportColumn] = {}
+    for site_key in SITE_CSV_OUTPUT_KEYS:
+        value_override = value_overrides.get(site_key)
+        if value_override is not None:
+            values = (value_override(site) for site in sites)
+        else:
+            digits_for_float = 6 if site_key in SITE_LOCATION_KEYS else 1
+            values = (
+                site_key.get_output_name_and_value(
                     site,
-                    digits_for_float=1,
+                    digits_for_float=digits_for_float,
                     xml_output=False,
-                )
-            if site_key == SiteKey.SITE_CAPEX:
-                output_value = site_type_to_cost[site.site_type]
-            elif site_key == SiteKey.ACTIVE_NODES:
-                output_value = len(active_nodes_per_site[site_id])
-            elif site_key == SiteKey.ACTIVE_SECTORS:
-                output_value = len(active_sectors_per_site[site_id])
-            elif site_key == SiteKey.ACTIVE_LINKS:
-                output_value = len(active_links_per_site[site_id])
-            elif site_key == SiteKey.HOPS_TO_NEAREST_POP:
-                output_value = hop_counts.get(site_id, "disconnected")
-            elif site_key == SiteKey.OUTGOING_FLOW:
-                output_value = site_flow.get(site.site_id, {}).get(
-                    "outgoing", 0
-                )
-            elif site_key == SiteKey.INCOMING_FLOW:
-                output_value = site_flow.get(site.site_id, {}).get(
-                    "incoming", 0
-                )
-            site_keys[output_name] = output_value
-        raw_sites[site_id] = site_keys
+                )[1]
+                for site in sites
+            )
+        values = (_zero_if_missing(value) for value in values)
+        # Fill the columns with a declared dtype, e.g. the float32 latitude
+        # and longitude, straight into their arrays
+        dtype = SITE_COLUMN_DTYPES.get(site_key)
+        columns[site_key.value.output_name] = (
+            list(values)
+            if dtype is None
+            else np.fromiter(values, dtype=dtype, count=len(sites))
+        )
 
-    names_exist = len(
-        [site.site_id for site in topology.sites.values() if site.name]
-    )
-    if names_exist > 0:
-        for site in topology.sites.values():
-            raw_sites[site.site_id][SiteKey.NAME.value.output_name] = site.name
+    return columns
 
-    series_list = [pd.Series(raw_sites[i]) for i in raw_sites]
-    sites_df = pd.DataFrame(series_list)
-    sites_df.fillna(0, inplace=True)
 
-    numeric_cols = [
-        SiteKey.LATITUDE.value.output_name,
-        SiteKey.LONGITUDE.value.output_name,
-    ]
-    sites_df[numeric_cols] = sites_df[numeric_cols].astype(np.float32)
+def _zero_if_missing(value: ReportValue) -> ReportValue:
+    """
+    Report a missing site value, i.e. a missing name or a NaN, as zero. NaN is
+    replaced with a float zero so that it does not change the column dtype.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, float) and math.isnan(value):
+        return 0.0
+    return value
+
+
+def build_sites_df(site_columns: Mapping[str, ReportColumn]) -> pd.DataFrame:
+    """
+    A function for building a pandas dataframe storing reported info about all
+    sites being reported on.
+    """
+    sites_df = build_df_from_columns(site_columns, SITE_COLUMN_DTYPES)
     return sites_df
 
 
-def dump_df_to_csv(df: pd.DataFrame, file_type: OutputFile) -> None:
+def build_df_from_columns(
+    columns: Mapping[str, ReportColumn],
+    column_dtypes: Dict[DataKey, Type[np.generic]],
+) -> pd.DataFrame:
+    """
+    Build a dataframe from the reported columns. Columns of the keys with a
+    declared dtype are converted directly, the others are left to pandas type
+    inference.
+    """
+    typed_columns: Dict[str, ReportColumn] = dict(columns)
+    for key, dtype in column_dtypes.items():
+        output_name = key.value.output_name
+        typed_columns[output_name] = np.asarray(
+            columns[output_name], dtype=dtype
+        )
+    return pd.DataFrame(typed_columns, copy=False)
+
+
+def dump_df_to_csv(
+    df: pd.DataFrame,
+    file_type: OutputFile,
+    *,
+    index: bool = True,
+) -> None:
+    """
+    Write the dataframe to the csv file of the file type.
+
+    @param index
+    If the dataframe index is written. Set it to False for a default range
+    index, which carries no information.
+    """
+    file_name = file_type.name.lower()
+    full_file_path = _get_csv_file_path(file_name)
+    df.to_csv(full_file_path, index=index, chunksize=CSV_CHUNK_SIZE)
+    logger.info(f"{file_name} csv file has been dumped to {full_file_path}")
+
+
+def _get_dump_dir() -> str:
     dump_dir = os.path.join(current_system_params.output_dir, "output")
-    if not os.path.exists(dump_dir):
-        os.mkdir(dump_dir)
-    full_file_path = os.path.join(dump_dir, f"{file_type.name.lower()}.csv")
-    df.to_csv(full_file_path)
-    logger.info(
-        f"{file_type.name.lower()} csv file has been dump to {full_file_path}"
-    )
+    os.makedirs(dump_dir, exist_ok=True)
+    return dump_dir
+
+
+def _get_csv_file_path(file_name: str) -> str:
+    dump_dir = _get_dump_dir()
+    return os.path.join(dump_dir, f"{file_name}.csv")
+
+
+class MetricsDumper(_Dumper):
+    """
+    YAML dumper of the metrics tree, which writes the metrics NamedTuples as
+    mappings of their fields and the Counters as mappings sorted by key.
+    """
+
+    def ignore_aliases(self, data: Any) -> bool:
+        # The metrics form a tree, so never write anchors and aliases
+        return True
+
+
+def _represent_named_tuple(dumper: MetricsDumper, data: Any) -> yaml.Node:
+    return dumper.represent_dict(zip(data._fields, data))
+
+
+def _represent_counter(
+    dumper: MetricsDumper, data: "Counter[CountKey]"
+) -> yaml.Node:
+    # Dump the counts in the order of their keys
+    return dumper.represent_dict(sorted(data.items()))
+
+
+for metrics_type in METRICS_NAMED_TUPLE_TYPES:
+    MetricsDumper.add_representer(metrics_type, _represent_named_tuple)
+MetricsDumper.add_representer(Counter, _represent_counter)
 
 
 def dump_metrics_to_yaml(metrics: TopologyMetrics) -> None:
-    def _convert_to_dict(obj: NamedTuple) -> Dict[str, Any]:
-        d = obj._asdict()
-        for k, v in d.items():
-            if isinstance(
-                v,
-                (
-                    TopologyMetrics,
-                    Capex,
-                    TopologyCounts,
-                    DemandMetrics,
-                    FlowMetrics,
-                    MetricStatistics,
-                    LinkMetrics,
-                    AvailabilityMetrics,
-                    FailureDisruption,
-                ),
-            ):
-                d[k] = _convert_to_dict(v)
-            elif isinstance(v, Counter):
-                d[k] = dict(v)
-        return d
+    dump_dir = _get_dump_dir()
+    file_name = OutputFile.METRICS.name.lower()
+    full_file_path = os.path.join(dump_dir, f"{file_name}.yaml")
+    # Emit the whole document in memory and write it at once
+    metrics_yaml = yaml.dump(metrics, Dumper=MetricsDumper, sort_keys=False)
+    with open(full_file_path, "w") as f:
+        f.write(metrics_yaml)
+    logger.info(f"{file_name} has been dumped to {full_file_path}")
 
-    dump_dir = os.path.join(current_system_params.output_dir, "output")
-    if not os.path.exists(dump_dir):
-        os.mkdir(dump_dir)
-    full_file_path = os.path.join(
-        dump_dir, f"{OutputFile.METRICS.name.lower()}.yaml"
-    )
+
+def dump_metrics_to_json(metrics: TopologyMetrics) -> None:
+    """
+    Dump the metrics as json. json object keys are strings, so numeric keys,
+    e.g. of the MCS counts, are written as strings.
+    """
+    dump_dir = _get_dump_dir()
+    file_name = OutputFile.METRICS.name.lower()
+    full_file_path = os.path.join(dump_dir, f"{file_name}.json")
     with open(full_file_path, "w") as f:
-        yaml.dump(_convert_to_dict(metrics), f, sort_keys=False)
-    logger.info(
-        f"{OutputFile.METRICS.name.lower()} has been dumped to {full_file_path}"
-    )
+        json.dump(convert_metrics_to_dict(metrics), f, indent=2)
+    logger.info(f"{file_name} has been dumped to {full_file_path}")
+
+
+def convert_metrics_to_dict(value: object) -> JsonValue:
+    """
+    Convert the metrics NamedTuples to dicts of their fields and the Counters
+    to dicts sorted by key, as they are dumped to yaml. Dict keys are
+    converted to strings, as they are written to json.
+    """
+    if isinstance(value, METRICS_NAMED_TUPLE_TYPES):
+        return {
+            field: convert_metrics_to_dict(field_value)
+            for field, field_value in value._asdict().items()
+        }
+    if isinstance(value, Counter):
+        return {str(key): count for key, count in sorted(value.items())}
+    if isinstance(value, dict):
+        return {
+            str(key): convert_metrics_to_dict(item)
+            for key, item in value.items()
+        }
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Metrics value of type {type(value)} is not supported")